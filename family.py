@@ -1,15 +1,31 @@
-from typing import List
+from typing import List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from solution_manager import SolutionManager
 
 class Family:
     """
-    Represents a family entity with their preferences and size.
+    Thin view over row `index` of the manager's family arrays (SoA storage).
+    Reads go straight to the shared NumPy columns.
     """
-    def __init__(self, family_id: int, n_members: int, preferences: List[int]) -> None:
-        self.id: int = family_id
-        self.n_members: int = n_members
-        self.preferences: List[int] = preferences
-        self.assigned_day: int = -1  # -1 implies 'Unassigned'
-
-    def assign_to(self, day: int) -> None:
-        """Assigns the family to a specific workshop day."""
-        self.assigned_day = day
\ No newline at end of file
+    __slots__ = ('index', '_store')
+
+    def __init__(self, index: int, store: 'SolutionManager') -> None:
+        self.index: int = index
+        self._store = store
+
+    @property
+    def id(self) -> int:
+        return self.index
+
+    @property
+    def n_members(self) -> int:
+        return int(self._store.n_members[self.index])
+
+    @property
+    def preferences(self) -> List[int]:
+        return self._store.prefs[self.index].tolist()
+
+    @property
+    def assigned_day(self) -> int:
+        return int(self._store.assigned_day[self.index])  # -1 implies 'Unassigned'
\ No newline at end of file
@@ -5,16 +5,17 @@ Creates synthetic CSV datasets with configurable demand patterns
 to stress-test the optimization pipeline.
 """
 
+import numpy as np
 import pandas as pd
-import random
 import os
-from typing import Literal
+from typing import Literal, Optional
 
 
 def create_dummy_data(
     filename: str, 
     num_families: int = 5000, 
-    mode: Literal['uniform', 'stressed', 'blind_spot'] = 'stressed'
+    mode: Literal['uniform', 'stressed', 'blind_spot'] = 'stressed',
+    seed: Optional[int] = None
 ) -> None:
     """
     Generate synthetic family preference data for testing.
@@ -26,44 +27,37 @@ def create_dummy_data(
             - 'uniform': Random distribution across all days (easy)
             - 'stressed': 75% demand concentrated in days 1-25 (realistic/hard)
             - 'blind_spot': Limited to days 1-60 (specific constraint testing)
+        seed: Seed for the NumPy generator (None = non-reproducible)
     """
     print(f"--- Generating {num_families} families in {mode.upper()} mode ---")
     
-    data = []
+    rng = np.random.default_rng(seed)
+    days = np.arange(1, 101)
     
-    for i in range(num_families):
-        fam_id = f"F{i:04d}"
-        n_members = random.randint(2, 9)
-        
-        # Generate 10 unique preferred days based on mode
-        prefs_set = set()
-        
-        while len(prefs_set) < 10:
-            if mode == 'stressed':
-                # Realistic scenario: heavy demand for holidays (days 1-25)
-                day = random.randint(1, 25) if random.random() < 0.75 else random.randint(26, 100)
-            elif mode == 'blind_spot':
-                day = random.randint(1, 60)
-            else:  # uniform
-                day = random.randint(1, 100)
-            
-            prefs_set.add(day)
-        
-        prefs = list(prefs_set)
-        random.shuffle(prefs)
-        
-        row = {
-            'familyID': fam_id,
-            'nrMembers': n_members,
-            'solution': ''
-        }
-        
-        for rank, day in enumerate(prefs):
-            row[f'day{rank}'] = day
-            
-        data.append(row)
-
-    df = pd.DataFrame(data)
+    # Probability of each day being drawn, based on mode
+    if mode == 'stressed':
+        # Realistic scenario: heavy demand for holidays (days 1-25)
+        p = np.concatenate([np.full(25, 0.75 / 25), np.full(75, 0.25 / 75)])
+    elif mode == 'blind_spot':
+        p = np.concatenate([np.full(60, 1 / 60), np.zeros(40)])
+    else:  # uniform
+        p = np.full(100, 1 / 100)
+    
+    # 10 unique weighted days per family in a single 2-D draw (Gumbel top-k):
+    # equivalent to drawing days one by one with probability p, rejecting repeats
+    with np.errstate(divide='ignore'):
+        keys = np.log(p) + rng.gumbel(size=(num_families, days.size))
+    prefs = days[np.argpartition(-keys, 9, axis=1)[:, :10]]
+    prefs = rng.permuted(prefs, axis=1)
+    
+    df = pd.DataFrame({
+        'familyID': [f"F{i:04d}" for i in range(num_families)],
+        'nrMembers': rng.integers(2, 10, size=num_families),
+        'solution': ''
+    })
+    
+    for rank in range(10):
+        df[f'day{rank}'] = prefs[:, rank]
     
     # Calculate total people
     total_people = df['nrMembers'].sum()
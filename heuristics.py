@@ -0,0 +1,58 @@
+"""
+Fast Heuristics - flat-array kernels for Santa Workshop Scheduling.
+Compiled with Numba when it is installed, plain Python/NumPy otherwise.
+"""
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; kernels run uncompiled without it
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+@njit(cache=True)
+def greedy_assign(
+    prefs: np.ndarray,
+    n_members: np.ndarray,
+    order: np.ndarray,
+    cap_min: int = 100,
+    cap_max: int = 300
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Greedy feasible assignment used as a solver warm start.
+
+    Families are visited in `order`; each takes its best preference with room
+    left (<= cap_max). Days that end below cap_min are emptied afterwards so
+    the result satisfies the semicontinuous opening rule.
+
+    Returns:
+        assigned: Day per family (-1 = unassigned), aligned with `n_members`
+        occ: Occupancy per day id (index 0 unused)
+    """
+    n_fam = n_members.shape[0]
+    assigned = -np.ones(n_fam, dtype=np.int32)
+    occ = np.zeros(101, dtype=np.int32)
+
+    for k in range(n_fam):
+        i = order[k]
+        for r in range(prefs.shape[1]):
+            d = prefs[i, r]
+            if occ[d] + n_members[i] <= cap_max:
+                occ[d] += n_members[i]
+                assigned[i] = d
+                break
+
+    # Semicontinuous rule: an under-filled day must close (0 people)
+    for i in range(n_fam):
+        d = assigned[i]
+        if d >= 0 and occ[d] < cap_min:
+            assigned[i] = -1
+    for d in range(occ.shape[0]):
+        if occ[d] < cap_min:
+            occ[d] = 0
+
+    return assigned, occ
@@ -2,6 +2,7 @@
 Main Entry Point - MODEL A (Maximization)
 """
 import os
+from concurrent.futures import ThreadPoolExecutor
 from solution_manager import SolutionManager
 from generate_data import create_dummy_data
 
@@ -9,30 +10,58 @@ from generate_data import create_dummy_data
 DATA_DIR = os.path.join(os.path.dirname(__file__), '.', 'data')
 INPUT_FILE = 'test_data_5000.csv'
 OUTPUT_FILE = 'submission_modelA.csv'
+SOLVER_BACKEND = 'cbc'  # Options: 'cbc', 'cbc_stream', 'cpsat' (cpsat falls back to CBC if OR-Tools is missing)
+
+# (input, output) pairs run in order. While one scenario solves, the next input is
+# loaded and the previous submission is written on a background I/O thread.
+SCENARIOS = [(INPUT_FILE, OUTPUT_FILE)]
+
+def load_scenario(input_path: str) -> SolutionManager:
+    manager = SolutionManager(SOLVER_BACKEND)
+    manager.load_data(input_path)
+    return manager
 
 def main() -> None:
     print("========================================")
     print("   SANTA WORKSHOP OPTIMIZER - MODEL A   ")
     print("========================================")
 
-    input_path = os.path.join(DATA_DIR, INPUT_FILE)
-    output_path = os.path.join(DATA_DIR, OUTPUT_FILE)
+    paths = []
+    for input_file, output_file in SCENARIOS:
+        input_path = os.path.join(DATA_DIR, input_file)
+        output_path = os.path.join(DATA_DIR, output_file)
+
+        # Check input
+        if not os.path.exists(input_path):
+            print(f"⚠️  Input file not found: {input_path}")
+            print("   Generating test data...")
+            create_dummy_data(input_file, num_families=5000, mode='stressed')
 
-    # Check input
-    if not os.path.exists(input_path):
-        print(f"⚠️  Input file not found: {input_path}")
-        print("   Generating test data...")
-        create_dummy_data(INPUT_FILE, num_families=5000, mode='stressed')
+        paths.append((input_path, output_path))
 
     # Run Process
-    manager = SolutionManager()
-    
-    try:
-        manager.load_data(input_path)
-        manager.solve()
-        manager.generate_submission(output_path)
-    except Exception as e:
-        print(f"❌ Critical Error: {e}")
+    with ThreadPoolExecutor(max_workers=1) as io_pool:
+        next_load = io_pool.submit(load_scenario, paths[0][0])
+        writes = []
+
+        for k, (_, output_path) in enumerate(paths):
+            current_load = next_load
+            if k + 1 < len(paths):
+                # Prefetch the next input while this scenario solves
+                next_load = io_pool.submit(load_scenario, paths[k + 1][0])
+
+            try:
+                manager = current_load.result()
+                manager.solve()
+                writes.append(io_pool.submit(manager.generate_submission, output_path))
+            except Exception as e:
+                print(f"❌ Critical Error: {e}")
+
+        for write in writes:
+            try:
+                write.result()
+            except Exception as e:
+                print(f"❌ Critical Error: {e}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,37 +2,124 @@
 Solution Manager - MODEL A (Top 10 Only)
 Simplified single-stage orchestrator.
 """
+import os
+import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
 from family import Family
 from workshop import WorkshopDay
 from solver_engine import SantaSolver
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pv
+    import pyarrow.parquet as pq
+except ImportError:  # PyArrow is optional; pandas' C parser is used and no Parquet is written
+    pa = pv = pq = None
+
+PREF_COLUMNS = [f'day{i}' for i in range(10)]
+CHUNK_SIZE = 10_000  # Rows per chunk when streaming the CSV in and out
+
+def _concat_chunks(column: str, arrays: List[np.ndarray]) -> np.ndarray:
+    """Join per-chunk arrays; a file with a header and no rows yields no chunks."""
+    if arrays:
+        return np.concatenate(arrays)
+    return np.empty(0, dtype=object if column == 'familyID' else np.int16)
+
 class SolutionManager:
-    def __init__(self) -> None:
-        self.families: Dict[int, Family] = {}
+    def __init__(self, backend: str = 'cbc') -> None:
+        # Family data is stored column-wise (SoA); Family objects are views over these rows.
+        # Families are identified internally by their row index 0..N-1; the input's
+        # string IDs ("F0004") are kept only for display and output.
+        self.fam_id_str: np.ndarray = np.empty(0, dtype=object)
+        # Day ids (1-100) fit in int8; sizes stay int16 so oversized families still load.
+        self.n_members: np.ndarray = np.empty(0, dtype=np.int16)
+        self.prefs: np.ndarray = np.empty((0, 10), dtype=np.int8)
+        self.assigned_day: np.ndarray = np.empty(0, dtype=np.int8)
+        self.families: List[Family] = []
         self.days: Dict[int, WorkshopDay] = {}
-        self.solver_engine = SantaSolver()
-        self.input_data: pd.DataFrame = None
+        self.solver_engine = SantaSolver(backend)
 
     def load_data(self, filepath: str) -> None:
         print(f"   [Manager] Loading data from {filepath}...")
-        df = pd.read_csv(filepath)
-        df.columns = [c.strip() for c in df.columns]
-        
-        self.input_data = df.copy()
 
-        for _, row in df.iterrows():
-            prefs = [int(row[f'day{i}']) for i in range(10)]
-            fam_id = row['familyID']
-            n_members = int(row['nrMembers'])
-            self.families[fam_id] = Family(fam_id, n_members, prefs)
+        # Re-runs reuse a Parquet snapshot of the input instead of re-parsing the CSV
+        cache_path = os.path.splitext(filepath)[0] + '.parquet'
+        if pq is not None and self._cache_is_fresh(cache_path, filepath):
+            print(f"   [Manager] Using Parquet cache {cache_path}")
+            columns = self._read_parquet(cache_path)
+        else:
+            columns = self._read_columns(filepath)
+            if pq is not None:
+                try:
+                    pq.write_table(pa.table(columns), cache_path)
+                except OSError as e:
+                    print(f"   [Manager] Could not write Parquet cache: {e}")
+
+        # Typed columns streamed from the parser, no intermediate DataFrame copy
+        prefs = np.column_stack([columns[c] for c in PREF_COLUMNS])
+        if prefs.size and (prefs.min() < 1 or prefs.max() > 100):
+            raise ValueError("Preferred days out of range (1-100)")
+
+        self.fam_id_str = columns['familyID']
+        self.n_members = columns['nrMembers'].astype(np.int16)
+        self.prefs = prefs.astype(np.int8)
+        self.assigned_day = np.full(len(self.fam_id_str), -1, dtype=np.int8)
+
+        self.families = [Family(i, self) for i in range(len(self.fam_id_str))]
 
         for d in range(1, 101):
             self.days[d] = WorkshopDay(d)
         
         print(f"   [Manager] {len(self.families)} families loaded.")
 
+    @staticmethod
+    def _read_columns(filepath: str) -> Dict[str, np.ndarray]:
+        """
+        Stream the input CSV in chunks into {column_name: array}, keeping only
+        the columns we use, so the whole frame is never held in memory at once.
+        """
+        numeric = ['nrMembers'] + PREF_COLUMNS
+        parts: Dict[str, List[np.ndarray]] = {c: [] for c in ['familyID'] + numeric}
+
+        if pv is not None:
+            column_types = {'familyID': pa.string(), 'solution': pa.string(),
+                            **{c: pa.int16() for c in numeric}}
+            reader = pv.open_csv(filepath, convert_options=pv.ConvertOptions(column_types=column_types))
+            names = {c.strip(): i for i, c in enumerate(reader.schema.names)}
+            for batch in reader:
+                for c in parts:
+                    parts[c].append(batch.column(names[c]).to_numpy(zero_copy_only=False))
+        else:
+            for chunk in pd.read_csv(filepath, chunksize=CHUNK_SIZE):
+                chunk.columns = [c.strip() for c in chunk.columns]
+                parts['familyID'].append(chunk['familyID'].to_numpy(dtype=object))
+                for c in numeric:
+                    parts[c].append(chunk[c].to_numpy(dtype=np.int16))
+
+        return {c: _concat_chunks(c, arrays) for c, arrays in parts.items()}
+
+    @staticmethod
+    def _cache_is_fresh(cache_path: str, source_path: str) -> bool:
+        """A cache is usable if it exists and is not older than its source CSV."""
+        if not os.path.exists(cache_path):
+            return False
+        if not os.path.exists(source_path):
+            return True
+        return os.path.getmtime(cache_path) >= os.path.getmtime(source_path)
+
+    @staticmethod
+    def _read_parquet(path: str) -> Dict[str, np.ndarray]:
+        """Stream a Parquet snapshot written by load_data back into {column_name: array}."""
+        names = ['familyID', 'nrMembers'] + PREF_COLUMNS
+        parts: Dict[str, List[np.ndarray]] = {c: [] for c in names}
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=CHUNK_SIZE, columns=names):
+            for c in names:
+                parts[c].append(batch.column(c).to_numpy(zero_copy_only=False))
+
+        return {c: _concat_chunks(c, arrays) for c, arrays in parts.items()}
+
     def solve(self) -> None:
         """Execute the single optimization stage."""
         print("\n   --- STARTING MODEL A: HAPPINESS MAXIMIZATION ---")
@@ -40,7 +127,8 @@ class SolutionManager:
         print("   ------------------------------------------------------\n")
         
         success = self.solver_engine.solve(
-            list(self.families.values()), 
+            self.n_members,
+            self.prefs,
             list(self.days.keys())
         )
 
@@ -52,20 +140,21 @@ class SolutionManager:
 
     def _apply_results(self) -> None:
         raw_assignments = self.solver_engine.get_raw_assignments()
-        
-        assigned_count = 0
-        unassigned_count = 0
+        n_assigned = len(raw_assignments)
 
-        for fam in self.families.values():
-            fam.assigned_day = -1
+        # One vectorized scatter instead of a per-family loop
+        self.assigned_day.fill(-1)
+        if n_assigned:
+            fam_idx = np.fromiter(raw_assignments.keys(), dtype=np.int64, count=n_assigned)
+            days = np.fromiter(raw_assignments.values(), dtype=np.int8, count=n_assigned)
+            self.assigned_day[fam_idx] = days
 
-        for fam_id, day in raw_assignments.items():
-            if fam_id in self.families:
-                fam = self.families[fam_id]
-                fam.assign_to(day)
-                self.days[day].add_family(fam)
-                assigned_count += 1
+        # Occupancy from a single bincount
+        occupancy = self._day_occupancy()
+        for d, day in self.days.items():
+            day.current_occupancy = int(occupancy[d])
 
+        assigned_count = n_assigned
         unassigned_count = len(self.families) - assigned_count
 
         print(f"   [Manager] Optimization completed.")
@@ -75,39 +164,78 @@ class SolutionManager:
         if unassigned_count > 0:
             print(f"   [NOTE] {unassigned_count} families will be marked with 'x' in the solution")
 
+    def _day_occupancy(self) -> np.ndarray:
+        """People per day id from the SoA columns (index 0 unused, days are 1..100)."""
+        assigned = self.assigned_day >= 0
+        return np.bincount(
+            self.assigned_day[assigned], weights=self.n_members[assigned], minlength=101
+        ).astype(np.int64)
+
     def generate_submission(self, output_path: str) -> None:
         print(f"   [Manager] Saving results to {output_path}...")
         
-        if self.input_data is None:
+        if not self.families:
             print("   [Error] No input data available. Call load_data first.")
             return
         
-        output_df = self.input_data.copy()
-        
-        solution_map = {fam_id: fam.assigned_day for fam_id, fam in self.families.items()}
-        output_df['solution'] = output_df['familyID'].map(solution_map)
-        
-        output_df['solution'] = output_df['solution'].apply(
-            lambda x: 'x' if x == -1 else x
-        )
-        
-        column_order = ['familyID', 'nrMembers'] + [f'day{i}' for i in range(10)] + ['solution']
-        output_df = output_df[column_order]
+        # Rebuild the output from the loaded columns, one chunk at a time;
+        # string IDs are joined back by position. CSV is the hand-off format
+        # and is always completed first.
+        for start, output_df in self._submission_chunks():
+            first = start == 0
+            output_df.to_csv(output_path, index=False, mode='w' if first else 'a', header=first)
+
+        # The Parquet copy is for internal reuse only; failing it must not affect the CSV
+        if pq is not None:
+            parquet_path = os.path.splitext(output_path)[0] + '.parquet'
+            try:
+                self._write_parquet_copy(parquet_path)
+                print(f"   [Manager] Parquet copy saved to {parquet_path}")
+            except (OSError, pa.ArrowException) as e:
+                print(f"   [Manager] Could not write Parquet copy: {e}")
         
-        output_df.to_csv(output_path, index=False)
         print(f"   [Manager] ✅ Submission file saved successfully.")
         print(f"   Format: Comma-separated with all input columns + solution")
 
+    def _submission_chunks(self) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """Yield (start_row, frame) chunks of the submission: input columns + solution."""
+        n_rows = len(self.fam_id_str)
+        for start in range(0, n_rows, CHUNK_SIZE):
+            rows = slice(start, min(start + CHUNK_SIZE, n_rows))
+            output_df = pd.DataFrame({'familyID': self.fam_id_str[rows], 'nrMembers': self.n_members[rows]})
+            for i, col in enumerate(PREF_COLUMNS):
+                output_df[col] = self.prefs[rows, i]
+
+            # assigned_day is row-aligned with the output, so no per-row map/apply is needed
+            assigned_day = self.assigned_day[rows]
+            output_df['solution'] = np.where(assigned_day == -1, 'x', assigned_day.astype(str))
+            yield start, output_df
+
+    def _write_parquet_copy(self, parquet_path: str) -> None:
+        parquet_writer = None
+        try:
+            for _, output_df in self._submission_chunks():
+                table = pa.Table.from_pandas(output_df, preserve_index=False)
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(parquet_path, table.schema)
+                parquet_writer.write_table(table)
+        finally:
+            if parquet_writer is not None:
+                parquet_writer.close()
+
     def print_occupancy_stats(self) -> None:
         """Display detailed occupancy statistics for diagnostics."""
-        occupancies = [d.current_occupancy for d in self.days.values()]
-        min_occ = min(occupancies)
-        max_occ = max(occupancies)
-        avg_occ = sum(occupancies) / len(occupancies)
+        # Per-day occupancy as set by _apply_results
+        occupancies = np.fromiter(
+            (d.current_occupancy for d in self.days.values()), dtype=np.int64, count=len(self.days)
+        )
+        min_occ = int(occupancies.min())
+        max_occ = int(occupancies.max())
+        avg_occ = float(occupancies.mean())
         
-        empty_days = sum(1 for x in occupancies if x == 0)
-        days_below_100 = sum(1 for x in occupancies if 0 < x < 100)
-        days_over_300 = sum(1 for x in occupancies if x > 300)
+        empty_days = int((occupancies == 0).sum())
+        days_below_100 = int(((occupancies > 0) & (occupancies < 100)).sum())
+        days_over_300 = int((occupancies > 300).sum())
         
         print("\n   --- WORKSHOP CAPACITY REPORT ---")
         print(f"   Minimum Occupancy: {min_occ}")
@@ -3,10 +3,21 @@ MIP Solver Engine - MODEL A (Strict / Semicontinuous)
 Strategy: "Maximize Happiness" with strict Day Closing logic.
 Rule: A day has either 0 people (Closed) OR between 100-300 (Open).
 """
+import os
+import re
+import subprocess
+import tempfile
+from collections import deque
+import numpy as np
 import pyomo.environ as pyo
 from pyomo.environ import SolverFactory, TerminationCondition
-from typing import List, Dict, Any, Optional
-from family import Family
+from typing import List, Dict, Any, Optional, Tuple
+from heuristics import greedy_assign
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:  # OR-Tools is optional; CBC remains available without it
+    cp_model = None
 
 class SantaSolver:
     # Happiness score per preference rank (Rank 0 = Top choice)
@@ -14,91 +25,154 @@ class SantaSolver:
         0: 100, 1: 90, 2: 85, 3: 80, 4: 75, 
         5: 70, 6: 60, 7: 50, 8: 40, 9: 30
     }
+    POINTS_BY_RANK = np.array(list(HAPPINESS_POINTS.values()), dtype=np.int16)
+
+    BACKENDS = ('cbc', 'cbc_stream', 'cpsat')
+
+    # CBC log line for a new incumbent (objective is -happiness, CBC minimizes)
+    INCUMBENT_PATTERN = re.compile(r"Integer solution of (\S+) found")
+
+    def __init__(self, backend: str = 'cbc') -> None:
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown solver backend '{backend}'. Options: {self.BACKENDS}")
+        if backend == 'cpsat' and cp_model is None:
+            print("   [Solver] OR-Tools not installed, falling back to CBC.")
+            backend = 'cbc'
 
-    def __init__(self) -> None:
+        self.backend: str = backend
         self.model: Optional[pyo.ConcreteModel] = None
         self.results: Optional[Any] = None
+        self.cp_assignments: Dict[int, int] = {}
+
+    def solve(self, n_members: np.ndarray, prefs: np.ndarray, days_range: List[int]) -> bool:
+        """
+        Solve for families indexed 0..N-1.
+        n_members[i] is the size of family i, prefs[i] its 10 preferred days (rank order).
+        """
+        if self.backend == 'cpsat':
+            return self._solve_cpsat(n_members, prefs, days_range)
+
+        # Greedy incumbent first: it is cheap and later seeds the solver
+        greedy = self._greedy_assignment(n_members, prefs)
 
-    def solve(self, families: List[Family], days_range: List[int]) -> bool:
         print("   [Solver] Building Strict Model (Semicontinuous variables)...")
         self.model = pyo.ConcreteModel()
 
+        # Plain Python views of the arrays for Pyomo indexing (ints, not NumPy scalars)
+        sizes = n_members.tolist()
+        n_fam = len(sizes)
+
         # --- 1. SETS ---
-        # Only create variables for valid preferences (Sparse Matrix approach)
-        valid_assignments = []
-        for fam in families:
-            for day in fam.preferences:
-                valid_assignments.append((fam.id, day))
+        # Only create variables for valid preferences (Sparse Matrix approach), minus
+        # those presolve proves unusable; the flat pairs array is converted to tuples
+        # only here, for Pyomo
+        pairs, pts_arr = self._reduced_pairs(n_members, prefs)
 
-        self.model.Assignments = pyo.Set(initialize=valid_assignments)
+        # Coefficient table (fam_idx[k], day[k], points[k]), built once and shared by
+        # the objective and, through the per-day CSR index, the occupancy constraints
+        fam_idx, day_arr = pairs[:, 0], pairs[:, 1]
+        day_order, day_ptr = self._day_csr(day_arr)
+
+        # Pairs stay family-major, so family i owns rows fam_ptr[i]:fam_ptr[i + 1]
+        fam_ptr = np.zeros(n_fam + 1, dtype=np.int64)
+        np.cumsum(np.bincount(fam_idx, minlength=n_fam), out=fam_ptr[1:])
+
+        self.model.Assignments = pyo.Set(initialize=[tuple(p) for p in pairs.tolist()], dimen=2)
         self.model.Days = pyo.Set(initialize=days_range)
-        self.model.Families = pyo.Set(initialize=[f.id for f in families])
+        self.model.Families = pyo.Set(initialize=range(n_fam))
 
         # --- 2. VARIABLES ---
-        # x[fam_id, day]: 1 if family is assigned, 0 otherwise
+        # x[fam_idx, day]: 1 if family is assigned, 0 otherwise
         self.model.x = pyo.Var(self.model.Assignments, domain=pyo.Binary)
 
         # z[day]: 1 if Day is OPEN, 0 if CLOSED
         self.model.z = pyo.Var(self.model.Days, domain=pyo.Binary)
 
+        # Days left without any usable request can never open
+        for d in days_range:
+            if day_ptr[d] == day_ptr[d + 1]:
+                self.model.z[d].fix(0)
+
         # --- 3. OBJECTIVE (Maximize Happiness) ---
+        coeff = list(zip(fam_idx.tolist(), day_arr.tolist(), pts_arr.tolist()))
+
         def objective_rule(m):
-            total_happiness = 0
-            for f in families:
-                for rank, day in enumerate(f.preferences):
-                    # Only sum points if the assignment variable x is 1
-                    total_happiness += m.x[f.id, day] * self.HAPPINESS_POINTS[rank]
-            return total_happiness
+            # quicksum builds one linear expression instead of re-expanding on every '+'
+            return pyo.quicksum(points * m.x[i, day] for i, day, points in coeff)
 
         self.model.Obj = pyo.Objective(rule=objective_rule, sense=pyo.maximize)
 
         # --- 4. CONSTRAINTS ---
 
         # C1: Each family assigned to AT MOST 1 day (or none)
-        def one_day_rule(m, fam_id):
-            # Get the family object to iterate only its preferences
-            current_fam = next((f for f in families if f.id == fam_id), None)
-            return sum(m.x[fam_id, d] for d in current_fam.preferences) <= 1
+        day_list = day_arr.tolist()
+        fam_bounds = fam_ptr.tolist()
+
+        def one_day_rule(m, i):
+            fam_days = day_list[fam_bounds[i]:fam_bounds[i + 1]]
+            if not fam_days:
+                return pyo.Constraint.Skip
+            return pyo.quicksum(m.x[i, d] for d in fam_days) <= 1
         
         self.model.OneDay = pyo.Constraint(self.model.Families, rule=one_day_rule)
 
         # Pre-calculate demand map for performance (Crucial for large datasets)
-        day_demand_map = {d: [] for d in days_range}
-        for f in families:
-            for d in f.preferences:
-                day_demand_map[d].append(f)
+        day_demand_map = {
+            d: fam_idx[day_order[day_ptr[d]:day_ptr[d + 1]]].tolist() for d in days_range
+        }
+
+        # Occupancy expression built once per requested day, shared by C2 and C3
+        occupancy_expr = {
+            d: pyo.quicksum(sizes[i] * self.model.x[i, d] for i in day_demand_map[d])
+            for d in days_range if day_demand_map[d]
+        }
 
         # C2: Lower Bound (Opening Threshold)
         # Occupancy >= 100 * z[d]
         def min_opening_rule(m, d):
-            if not day_demand_map[d]: 
-                # If no one requests this day, force it closed (z=0)
-                return 0 >= 100 * m.z[d]
+            if d not in occupancy_expr: 
+                # No usable request: z[d] is already fixed closed (z=0)
+                return pyo.Constraint.Skip
             
-            occupancy = sum(m.x[f.id, d] * f.n_members for f in day_demand_map[d])
-            return occupancy >= 100 * m.z[d]
+            return occupancy_expr[d] >= 100 * m.z[d]
         
         self.model.MinOpen = pyo.Constraint(self.model.Days, rule=min_opening_rule)
 
         # C3: Upper Bound (Max Capacity)
         # Occupancy <= 300 * z[d]
         def max_opening_rule(m, d):
-            if not day_demand_map[d]:
+            if d not in occupancy_expr:
                 return pyo.Constraint.Skip
             
-            occupancy = sum(m.x[f.id, d] * f.n_members for f in day_demand_map[d])
-            return occupancy <= 300 * m.z[d]
+            return occupancy_expr[d] <= 300 * m.z[d]
         
         self.model.MaxOpen = pyo.Constraint(self.model.Days, rule=max_opening_rule)
 
-        # --- 5. EXECUTION ---
+        # --- 5. WARM START (Greedy incumbent) ---
+        greedy_days = greedy.tolist()
+        open_days = set(greedy_days)
+        for (i, day) in self.model.Assignments:
+            self.model.x[i, day].value = 1 if greedy_days[i] == day else 0
+        for d in days_range:
+            if not self.model.z[d].fixed:
+                self.model.z[d].value = 1 if d in open_days else 0
+
+        # --- 6. EXECUTION ---
+        cbc_options = {
+            'seconds': 450,
+            'ratio': 0.01,
+            'threads': os.cpu_count() or 1,
+        }
+
+        if self.backend == 'cbc_stream':
+            return self._run_cbc_stream(cbc_options)
+
         print("   [Solver] Running CBC (Branch & Bound)...")
         optimizer = SolverFactory('cbc')
-        optimizer.options['seconds'] = 450 
-        optimizer.options['ratio'] = 0.01
+        optimizer.options.update(cbc_options)
 
         try:
-            self.results = optimizer.solve(self.model, tee=True)
+            self.results = optimizer.solve(self.model, tee=True, warmstart=True)
             status = self.results.solver.termination_condition
             print(f"   [Solver] Final Status: {status}")
             return status in [TerminationCondition.optimal, TerminationCondition.feasible, TerminationCondition.maxTimeLimit]
@@ -106,12 +180,207 @@ class SantaSolver:
             print(f"   [Error] Solver failed: {e}")
             return False
 
+    def _run_cbc_stream(self, cbc_options: Dict[str, Any]) -> bool:
+        """
+        Run the CBC binary as a subprocess on an LP export of the model, reporting
+        each new incumbent as CBC finds it, then load CBC's solution file back.
+        The calling thread only waits on the pipe, so other threads can do I/O meanwhile.
+        """
+        print("   [Solver] Running CBC subprocess (Branch & Bound)...")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            lp_path = os.path.join(tmp_dir, 'model.lp')
+            start_path = os.path.join(tmp_dir, 'start.soln')
+            sol_path = os.path.join(tmp_dir, 'model.soln')
+
+            _, smap_id = self.model.write(lp_path, io_options={'symbolic_solver_labels': True})
+            symbol_map = self.model.solutions.symbol_map[smap_id]
+
+            # MIP start in CBC's "index name value" format (non-zero values only)
+            with open(start_path, 'w') as start_file:
+                column = 0
+                for var in self.model.component_data_objects(pyo.Var):
+                    if var.value and id(var) in symbol_map.byObject:
+                        start_file.write(f"{column} {symbol_map.byObject[id(var)]} {var.value}\n")
+                        column += 1
+
+            cmd = ['cbc', lp_path]
+            for key, value in cbc_options.items():
+                cmd += [f'-{key}', str(value)]
+            cmd += ['-mipstart', start_path, '-solve', '-solution', sol_path]
+
+            try:
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            except OSError as e:
+                print(f"   [Error] Solver failed: {e}")
+                return False
+
+            # Keep the end of the log so failures can be diagnosed
+            log_tail = deque(maxlen=20)
+            for line in proc.stdout:
+                log_tail.append(line.rstrip())
+                match = self.INCUMBENT_PATTERN.search(line)
+                if match:
+                    print(f"   [Solver] New incumbent: happiness {-float(match.group(1)):.0f}")
+            proc.wait()
+
+            if proc.returncode != 0 or not os.path.exists(sol_path):
+                print(f"   [Error] Solver failed: CBC exited with code {proc.returncode}. Last log lines:")
+                for line in log_tail:
+                    print(f"      {line}")
+                return False
+
+            return self._load_cbc_solution(sol_path, symbol_map)
+
+    def _load_cbc_solution(self, sol_path: str, symbol_map: Any) -> bool:
+        """Copy values from a CBC solution file into the model variables."""
+        with open(sol_path) as sol_file:
+            # e.g. "Optimal - objective value 471965.0" / "Stopped on time - objective value ..."
+            header = sol_file.readline().strip()
+            print(f"   [Solver] Final Status: {header}")
+            if 'infeasible' in header.lower() or 'no integer solution' in header.lower():
+                return False
+
+            # CBC may omit zero-valued columns
+            for var in self.model.component_data_objects(pyo.Var):
+                if not var.fixed:
+                    var.set_value(0, skip_validation=True)
+
+            for line in sol_file:
+                tokens = line.replace('**', ' ').split()
+                if len(tokens) < 3:
+                    continue
+                var = symbol_map.bySymbol.get(tokens[1])
+                if var is not None:
+                    # CBC values may be only near-integral (e.g. 0.9999999); skip domain checks
+                    var.set_value(float(tokens[2]), skip_validation=True)
+        return True
+
+    @staticmethod
+    def _assignment_pairs(prefs: np.ndarray) -> np.ndarray:
+        """Flat (fam_idx, day) int32 array, one row per valid preference, family-major."""
+        n_fam, n_prefs = prefs.shape
+        pairs = np.empty((n_fam * n_prefs, 2), dtype=np.int32)
+        pairs[:, 0] = np.repeat(np.arange(n_fam, dtype=np.int32), n_prefs)
+        pairs[:, 1] = prefs.ravel()
+        return pairs
+
+    def _reduced_pairs(self, n_members: np.ndarray, prefs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Valid (fam_idx, day) pairs and their happiness points, without the
+        assignments that cannot appear in any feasible solution:
+          - families of more than 300 people fit on no day;
+          - a day whose total requesting demand is below 100 can never open.
+        """
+        pairs = self._assignment_pairs(prefs)
+        pts_arr = np.tile(self.POINTS_BY_RANK[:prefs.shape[1]], prefs.shape[0])
+
+        fits = n_members[pairs[:, 0]] <= 300
+        demand = np.bincount(pairs[fits, 1], weights=n_members[pairs[fits, 0]], minlength=101)
+        keep = fits & (demand[pairs[:, 1]] >= 100)
+
+        removed = int(pairs.shape[0] - keep.sum())
+        if removed:
+            print(f"   [Solver] Presolve: dropped {removed} infeasible of {pairs.shape[0]} assignment pairs")
+        return pairs[keep], pts_arr[keep]
+
+    @staticmethod
+    def _day_csr(day_arr: np.ndarray, n_days: int = 100) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        CSR index of the pairs array by day: rows of day d are
+        order[ptr[d]:ptr[d + 1]] (day ids are 1-based, slot 0 is empty).
+        """
+        order = np.argsort(day_arr, kind='stable')
+        ptr = np.zeros(n_days + 2, dtype=np.int64)
+        np.cumsum(np.bincount(day_arr, minlength=n_days + 1), out=ptr[1:])
+        return order, ptr
+
+    def _greedy_assignment(self, n_members: np.ndarray, prefs: np.ndarray) -> np.ndarray:
+        """
+        Feasible starting point from `greedy_assign` (largest families first).
+        Returns the day per family (-1 = unassigned).
+        """
+        prefs = prefs.astype(np.int32)
+        n_members = n_members.astype(np.int32)
+        order = np.argsort(-n_members, kind='stable')
+
+        assigned, _ = greedy_assign(prefs, n_members, order)
+
+        placed = np.flatnonzero(assigned >= 0)
+        ranks = np.argmax(prefs[placed] == assigned[placed, None], axis=1)
+        happiness = int(self.POINTS_BY_RANK[ranks].sum(dtype=np.int64))
+        print(f"   [Solver] Greedy warm start: {placed.size} families, happiness {happiness}")
+
+        return assigned
+
+    def _solve_cpsat(self, n_members: np.ndarray, prefs: np.ndarray, days_range: List[int]) -> bool:
+        """Same model as the CBC path, solved with OR-Tools CP-SAT (parallel workers)."""
+        # Greedy incumbent first: it is passed to CP-SAT as a solution hint
+        greedy = self._greedy_assignment(n_members, prefs)
+
+        print("   [Solver] Building Strict Model for CP-SAT...")
+        model = cp_model.CpModel()
+
+        # One x per row of the (presolved) pairs array; rows are family-major,
+        # so each family owns one contiguous run of x
+        pairs, pts_arr = self._reduced_pairs(n_members, prefs)
+        x = [model.NewBoolVar(f"x[{i},{day}]") for i, day in pairs.tolist()]
+        z = {d: model.NewBoolVar(f"z[{d}]") for d in days_range}
+
+        # C1: Each family assigned to AT MOST 1 day (or none)
+        fam_bounds = np.flatnonzero(np.diff(pairs[:, 0], prepend=-1, append=-1)).tolist()
+        for start, stop in zip(fam_bounds[:-1], fam_bounds[1:]):
+            model.AddAtMostOne(x[start:stop])
+
+        # C2/C3: Occupancy is 0 (closed) or within [100, 300] (open)
+        row_sizes = n_members[pairs[:, 0]].tolist()
+        day_order, day_ptr = self._day_csr(pairs[:, 1])
+        for d in days_range:
+            rows = day_order[day_ptr[d]:day_ptr[d + 1]].tolist()
+            if not rows:
+                model.Add(z[d] == 0)
+                continue
+            occupancy = cp_model.LinearExpr.WeightedSum(
+                [x[k] for k in rows], [row_sizes[k] for k in rows]
+            )
+            model.Add(occupancy >= 100 * z[d])
+            model.Add(occupancy <= 300 * z[d])
+
+        model.Maximize(cp_model.LinearExpr.WeightedSum(x, pts_arr.tolist()))
+
+        # Warm start: hint the greedy assignment (its pairs always survive presolve)
+        greedy_days = greedy.tolist()
+        open_days = set(greedy_days)
+        for var, (i, day) in zip(x, pairs.tolist()):
+            model.AddHint(var, greedy_days[i] == day)
+        for d in days_range:
+            model.AddHint(z[d], d in open_days)
+
+        print("   [Solver] Running CP-SAT...")
+        solver = cp_model.CpSolver()
+        solver.parameters.num_workers = 8
+        solver.parameters.max_time_in_seconds = 450
+        solver.parameters.relative_gap_limit = 0.01
+        solver.parameters.log_search_progress = True
+
+        status = solver.Solve(model)
+        print(f"   [Solver] Final Status: {solver.StatusName(status)}")
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return False
+
+        self.cp_assignments = {
+            i: day for (i, day), var in zip(pairs.tolist(), x) if solver.BooleanValue(var)
+        }
+        return True
+
     def get_raw_assignments(self) -> Dict[int, int]:
-        """Returns dictionary {fam_id: assigned_day}."""
+        """Returns dictionary {fam_idx: assigned_day}."""
+        if self.backend == 'cpsat':
+            return dict(self.cp_assignments)
+
         assignments = {}
         if self.model is None: return {}
 
-        for (fam_id, day) in self.model.Assignments:
-            if pyo.value(self.model.x[fam_id, day]) > 0.5:
-                assignments[fam_id] = day
+        for (i, day) in self.model.Assignments:
+            if pyo.value(self.model.x[i, day]) > 0.5:
+                assignments[i] = day
         return assignments
\ No newline at end of file